@@ -97,6 +97,7 @@ connectors_reqs = {
     "dropbox": load_requirements("requirements/connectors/dropbox.in"),
     "elasticsearch": load_requirements("requirements/connectors/elasticsearch.in"),
     "gcs": load_requirements("requirements/connectors/gcs.in"),
+    "gcs-uring": load_requirements("requirements/connectors/gcs-uring.in"),
     "github": load_requirements("requirements/connectors/github.in"),
     "gitlab": load_requirements("requirements/connectors/gitlab.in"),
     "google-drive": load_requirements("requirements/connectors/google-drive.in"),
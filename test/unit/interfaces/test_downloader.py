@@ -0,0 +1,202 @@
+import asyncio
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from unstructured_ingest.v2.interfaces import (
+    Downloader,
+    DownloaderConfig,
+    FileData,
+    FileDataSourceMetadata,
+    PrefetchingDownloader,
+    SourceIdentifiers,
+)
+from unstructured_ingest.v2.interfaces import downloader as downloader_module
+
+
+@dataclass
+class DummyDownloader(Downloader):
+    connection_config: Any = None
+    connector_type: str = "dummy"
+    download_config: DownloaderConfig = field(default_factory=DownloaderConfig)
+
+    def run(self, file_data: FileData, **kwargs: Any):
+        file_data.additional_metadata["thread_id"] = threading.get_ident()
+        return self.generate_download_response(
+            file_data=file_data, download_path=self.get_download_path(file_data=file_data)
+        )
+
+
+def get_file_data(filename: str, date_created=None, date_modified=None) -> FileData:
+    return FileData(
+        identifier=filename,
+        connector_type="dummy",
+        source_identifiers=SourceIdentifiers(filename=filename, fullpath=filename),
+        metadata=FileDataSourceMetadata(date_created=date_created, date_modified=date_modified),
+    )
+
+
+@pytest.mark.parametrize(
+    ("date_created", "date_modified", "expected"),
+    [
+        ("1000.5", "2000.5", (1000.5, 2000.5)),
+        (1000.0, 2000.0, (1000.0, 2000.0)),
+        (None, "2000.5", None),
+        ("1000.5", "not a date", None),
+    ],
+)
+def test_parse_times(date_created, date_modified, expected):
+    metadata = FileDataSourceMetadata(date_created=date_created, date_modified=date_modified)
+    assert Downloader._parse_times(metadata) == expected
+
+
+def test_generate_download_responses_bulk(tmp_path: Path):
+    downloader = DummyDownloader(download_config=DownloaderConfig(download_dir=tmp_path))
+    timed_path = tmp_path / "timed.txt"
+    untimed_path = tmp_path / "untimed.txt"
+    timed_path.write_text("timed")
+    untimed_path.write_text("untimed")
+    untimed_mtime = untimed_path.stat().st_mtime
+    shard_path = tmp_path / "shard.bin"
+    shard_path.write_text("xxpacked")
+    shard_mtime = shard_path.stat().st_mtime
+    packed = get_file_data("packed.txt", "1000", "2000")
+    packed.local_download_byte_range = (2, 6)
+
+    responses = downloader.generate_download_responses_bulk(
+        [
+            (get_file_data("timed.txt", "1000", "2000"), timed_path),
+            (get_file_data("untimed.txt"), untimed_path),
+            (packed, shard_path),
+        ]
+    )
+
+    assert [r["path"] for r in responses] == [timed_path, untimed_path, shard_path]
+    assert os.stat(timed_path).st_mtime == 2000
+    assert os.stat(untimed_path).st_mtime == untimed_mtime
+    # the shard is shared with other files, its timestamps are left alone
+    assert os.stat(shard_path).st_mtime == shard_mtime
+    assert responses[2]["byte_range"] == (2, 6)
+    assert responses[0]["file_data"].local_download_path == str(timed_path.resolve())
+
+
+@pytest.mark.asyncio
+async def test_run_async_does_not_block_event_loop(tmp_path: Path):
+    downloader = DummyDownloader(download_config=DownloaderConfig(download_dir=tmp_path))
+    (tmp_path / "file.txt").write_text("content")
+
+    response = await downloader.run_async(file_data=get_file_data("file.txt"))
+
+    assert response["path"] == tmp_path / "file.txt"
+    assert response["file_data"].additional_metadata["thread_id"] != threading.get_ident()
+
+
+@pytest.mark.parametrize(
+    ("rel_path", "expected"),
+    [
+        ("file.txt", "file.txt"),
+        ("/nested/file.txt", "nested/file.txt"),
+        ("nested/deeper/file.txt", "nested/deeper/file.txt"),
+    ],
+)
+def test_get_download_path(tmp_path: Path, rel_path, expected):
+    downloader = DummyDownloader(download_config=DownloaderConfig(download_dir=tmp_path))
+    file_data = get_file_data("file.txt")
+    file_data.source_identifiers.rel_path = rel_path
+
+    assert downloader.get_download_path(file_data=file_data) == tmp_path / expected
+
+    downloader.download_config.download_dir = tmp_path / "other"
+    assert downloader.get_download_path(file_data=file_data) == tmp_path / "other" / expected
+
+
+@dataclass
+class SlowDummyDownloader(DummyDownloader):
+    in_flight: int = 0
+    max_in_flight: int = 0
+    cancelled: int = 0
+
+    async def run_async(self, file_data: FileData, **kwargs: Any):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(file_data.additional_metadata.get("delay", 0.01))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        return self.run(file_data=file_data, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_iter_prefetched(tmp_path: Path):
+    downloader = SlowDummyDownloader(download_config=DownloaderConfig(download_dir=tmp_path))
+    filenames = [f"file{i}.txt" for i in range(5)]
+    for filename in filenames:
+        (tmp_path / filename).write_text(filename)
+    prefetching_downloader = PrefetchingDownloader(downloader=downloader, slots=2)
+
+    responses = [
+        response
+        async for response in prefetching_downloader.iter_prefetched(
+            file_datas=[get_file_data(filename) for filename in filenames]
+        )
+    ]
+
+    assert [r["path"].name for r in responses] == filenames
+    # the file being consumed plus two prefetched ones
+    assert downloader.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_prefetched_cancels_pending_on_early_exit(tmp_path: Path):
+    downloader = SlowDummyDownloader(download_config=DownloaderConfig(download_dir=tmp_path))
+    (tmp_path / "file.txt").write_text("content")
+    file_datas = [get_file_data("file.txt") for _ in range(5)]
+    for file_data in file_datas[1:]:
+        file_data.additional_metadata["delay"] = 10
+    iterator = PrefetchingDownloader(downloader=downloader, slots=2).iter_prefetched(
+        file_datas=file_datas
+    )
+
+    await iterator.__anext__()
+    await iterator.aclose()
+    await asyncio.sleep(0)
+
+    assert downloader.cancelled == 2
+    assert downloader.in_flight == 0
+
+
+def test_ensure_parent_dir(tmp_path: Path, monkeypatch):
+    downloader = DummyDownloader(download_config=DownloaderConfig(download_dir=tmp_path))
+    makedirs_calls = []
+    makedirs = os.makedirs
+
+    def counting_makedirs(name, *args, **kwargs):
+        makedirs_calls.append(name)
+        return makedirs(name, *args, **kwargs)
+
+    monkeypatch.setattr(os, "makedirs", counting_makedirs)
+
+    for filename in ["a.txt", "b.txt", "nested/c.txt"]:
+        downloader.ensure_parent_dir(tmp_path / "dir" / filename)
+    assert makedirs_calls == [str(tmp_path / "dir"), str(tmp_path / "dir" / "nested")]
+    assert (tmp_path / "dir" / "nested").is_dir()
+
+    downloader.forget_created_dirs()
+    downloader.ensure_parent_dir(tmp_path / "dir" / "a.txt")
+    assert len(makedirs_calls) == 3
+
+
+def test_default_download_dir(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(downloader_module, "DEFAULT_DOWNLOAD_ROOT", str(tmp_path / "download"))
+    downloader = DummyDownloader()
+
+    assert downloader.download_dir == tmp_path / "download" / "dummy"
+    assert downloader.download_config.download_dir == downloader.download_dir
+    assert downloader.download_dir.is_dir()
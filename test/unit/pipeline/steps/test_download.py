@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from unstructured_ingest.v2.interfaces import (
+    FileData,
+    FileDataSourceMetadata,
+    ProcessorConfig,
+    SourceIdentifiers,
+)
+from unstructured_ingest.v2.pipeline.steps import download
+from unstructured_ingest.v2.pipeline.steps.download import DownloadStep
+from unstructured_ingest.v2.processes.connectors.local import (
+    LocalConnectionConfig,
+    LocalDownloader,
+    LocalDownloaderConfig,
+)
+
+
+def get_step(tmp_path: Path) -> DownloadStep:
+    return DownloadStep(
+        process=LocalDownloader(
+            connection_config=LocalConnectionConfig(),
+            download_config=LocalDownloaderConfig(download_dir=tmp_path),
+        ),
+        context=ProcessorConfig(work_dir=str(tmp_path)),
+    )
+
+
+def test_get_hash_serializes_configs_once(tmp_path: Path, monkeypatch):
+    step = get_step(tmp_path=tmp_path)
+    serialize_calls = []
+    serialize_base_model_json = download.serialize_base_model_json
+
+    def counting_serialize(*args, **kwargs):
+        serialize_calls.append(kwargs["model"])
+        return serialize_base_model_json(*args, **kwargs)
+
+    monkeypatch.setattr(download, "serialize_base_model_json", counting_serialize)
+
+    hashes = [step.get_hash(extras=[identifier]) for identifier in ["a", "b", "a"]]
+
+    expected_string = json.dumps(
+        {
+            "download_config": json.loads(
+                serialize_base_model_json(model=step.process.download_config)
+            ),
+            "connection_config": json.loads(
+                serialize_base_model_json(model=step.process.connection_config)
+            ),
+        },
+        sort_keys=True,
+    )
+    assert hashes[0] == hashlib.sha256((expected_string + "a").encode()).hexdigest()[:12]
+    assert hashes[0] == hashes[2] != hashes[1]
+    assert len(serialize_calls) == 2
+
+
+@pytest.mark.parametrize(
+    ("date_modified", "expected"),
+    [(None, False), ("not a date", False), ("1000", True), ("3000", False)],
+)
+def test_should_download_existing_file(tmp_path: Path, date_modified, expected):
+    step = get_step(tmp_path=tmp_path)
+    path = tmp_path / "file.txt"
+    path.write_text("content")
+    os.utime(path, times=(2000, 2000))
+    file_data = FileData(
+        identifier="file.txt",
+        connector_type="local",
+        source_identifiers=SourceIdentifiers(filename="file.txt", fullpath=str(path)),
+        metadata=FileDataSourceMetadata(date_modified=date_modified),
+    )
+
+    assert (
+        step.should_download(file_data=file_data, file_data_path=str(tmp_path / "file_data.json"))
+        is expected
+    )
+    assert file_data.reprocess is expected
+
+
+def test_call_closes_downloader(tmp_path: Path, monkeypatch):
+    step = get_step(tmp_path=tmp_path)
+    close_calls = []
+    monkeypatch.setattr(step.process, "close", lambda: close_calls.append(True))
+
+    step([])
+
+    assert close_calls == [True]
+
+
+def test_packed_download_is_not_downloaded_again(tmp_path: Path, monkeypatch):
+    step = get_step(tmp_path=tmp_path)
+    shard_path = tmp_path / "shard.bin"
+    shard_path.write_bytes(b"xxcontent")
+    monkeypatch.setattr(step.process, "get_packed_download", lambda file_data: (shard_path, (2, 7)))
+    file_data = FileData(
+        identifier="file.txt",
+        connector_type="local",
+        source_identifiers=SourceIdentifiers(filename="file.txt", fullpath="file.txt"),
+    )
+    file_data_path = tmp_path / "file_data.json"
+    file_data.to_file(path=str(file_data_path))
+
+    def fail_download(**kwargs):
+        raise AssertionError("packed file was downloaded again")
+
+    responses = asyncio.run(step._run_async(fn=fail_download, file_data_path=str(file_data_path)))
+
+    assert responses == [{"file_data_path": str(file_data_path), "path": str(shard_path)}]
+    updated = FileData.from_file(path=str(file_data_path))
+    assert updated.local_download_byte_range == (2, 7)
+    assert updated.metadata.filesize_bytes == 7
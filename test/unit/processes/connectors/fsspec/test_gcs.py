@@ -0,0 +1,516 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from unstructured_ingest.error import SourceConnectionNetworkError
+from unstructured_ingest.v2.interfaces import FileData, FileDataSourceMetadata, SourceIdentifiers
+from unstructured_ingest.v2.processes.connectors.fsspec.gcs import (
+    GcsAccessConfig,
+    GcsConnectionConfig,
+    GcsDownloader,
+    GcsDownloaderConfig,
+    GcsIndexer,
+    GcsIndexerConfig,
+)
+
+
+@pytest.mark.parametrize(
+    ("service_account_key", "expected_token", "checks_file"),
+    [
+        (None, None, False),
+        ("google_default", "google_default", False),
+        ('{"some_key": "some_value"}', {"some_key": "some_value"}, False),
+        ("/tmp/gcs.key", "/tmp/gcs.key", True),
+    ],
+)
+def test_access_config_token(mocker, service_account_key, expected_token, checks_file):
+    mocked_isfile: MagicMock = mocker.patch("pathlib.Path.is_file")
+    mocked_isfile.return_value = True
+
+    access_config = GcsAccessConfig(service_account_key=service_account_key)
+
+    assert access_config.token == expected_token
+    assert mocked_isfile.called == checks_file
+
+
+def test_connection_config_supported_protocols():
+    first, second = GcsConnectionConfig(), GcsConnectionConfig()
+
+    assert first.supported_protocols is second.supported_protocols
+    # serialized the same as the previous list default, so record hashes don't change
+    assert first.model_dump()["supported_protocols"] == ("gs", "gcs")
+    assert '"supported_protocols":["gs","gcs"]' in first.model_dump_json()
+
+
+class FakeContent:
+    def __init__(self, data: bytes, delay: float = 0):
+        self.data = data
+        self.delay = delay
+        self.position = 0
+
+    async def read(self, n: int) -> bytes:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        chunk = self.data[self.position : self.position + n]
+        self.position += len(chunk)
+        return chunk
+
+
+class FakeResponse:
+    def __init__(self, data: bytes, generation: str, status: int = 206):
+        self.status = status
+        self.headers = {"x-goog-generation": generation}
+        self.content = FakeContent(data)
+
+    async def read(self) -> bytes:
+        return self.content.data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeSession:
+    def __init__(self, fs: "FakeAsyncGcsFileSystem"):
+        self.fs = fs
+
+    def get(self, url: str, params: dict, headers: dict, timeout: int) -> FakeResponse:
+        start, end = [int(i) for i in headers["Range"][len("bytes=") :].split("-")]
+        self.fs.ranges.append((start, end + 1))
+        self.fs.requested_generations.append(params.get("generation"))
+        if params.get("generation") not in (None, self.fs.generation):
+            return FakeResponse(b"", generation=self.fs.generation, status=404)
+        return FakeResponse(self.fs.content[start : end + 1], generation=self.fs.generation)
+
+
+class FakeAsyncGcsFileSystem:
+    requests_timeout = None
+
+    def __init__(self, content: bytes, generation: str = "1"):
+        self.content = content
+        self.generation = generation
+        self.ranges = []
+        self.requested_generations = []
+        self.info_calls = 0
+        self.session = FakeSession(fs=self)
+
+    def url(self, path: str) -> str:
+        return path
+
+    def _get_params(self, kwargs: dict) -> dict:
+        return kwargs
+
+    def _get_headers(self, headers: dict) -> dict:
+        return headers
+
+    async def _info(self, path: str) -> dict:
+        self.info_calls += 1
+        return {
+            "name": path,
+            "size": len(self.content),
+            "type": "file",
+            "generation": self.generation,
+        }
+
+    async def _get_file(self, rpath: str, lpath: str) -> None:
+        Path(lpath).write_bytes(self.content)
+
+
+def get_file_data(size=None, generation=None) -> FileData:
+    additional_metadata = {"original_file_path": "bucket/file.bin"}
+    if generation is not None:
+        additional_metadata["generation"] = generation
+    return FileData(
+        identifier="test",
+        connector_type="gcs",
+        source_identifiers=SourceIdentifiers(
+            filename="file.bin", fullpath="bucket/file.bin", rel_path="file.bin"
+        ),
+        metadata=FileDataSourceMetadata(filesize_bytes=size),
+        additional_metadata=additional_metadata,
+    )
+
+
+def get_downloader(tmp_path: Path, fs: FakeAsyncGcsFileSystem, **kwargs) -> GcsDownloader:
+    downloader = GcsDownloader(
+        connection_config=GcsConnectionConfig(),
+        download_config=GcsDownloaderConfig(
+            download_dir=tmp_path, parallel_part_size=10, stream_chunk_size=3, **kwargs
+        ),
+    )
+
+    async def get_async_fs():
+        return fs
+
+    downloader.get_async_fs = get_async_fs
+    return downloader
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "uring_config",
+    [
+        {},
+        {"use_uring": True},
+        {"use_uring": True, "use_uring_sqpoll": True},
+        {"use_uring": True, "uring_registered_buffers": 2},
+    ],
+    ids=["pwrite", "uring", "sqpoll", "fixed_buffers"],
+)
+async def test_download_in_parts(tmp_path: Path, uring_config: dict):
+    pytest.importorskip("gcsfs")
+    content = bytes(range(95))
+    fs = FakeAsyncGcsFileSystem(content=content)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, **uring_config)
+
+    response = await downloader.run_async(file_data=get_file_data())
+
+    assert response["path"].read_bytes() == content
+    assert sorted(fs.ranges) == [(i, min(i + 10, 95)) for i in range(0, 95, 10)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("content", "sqpoll", "registers"),
+    [(bytes(range(95)), False, True), (b"small", False, False), (b"small", True, True)],
+    ids=["ranged", "single_stream", "single_stream_sqpoll"],
+)
+async def test_download_registers_fd_for_multi_write_downloads(
+    tmp_path: Path, monkeypatch, content: bytes, sqpoll: bool, registers: bool
+):
+    pytest.importorskip("gcsfs")
+    fs = FakeAsyncGcsFileSystem(content=content)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, use_uring=True)
+    writer = downloader.uring_writer
+    registered = []
+    monkeypatch.setattr(writer, "sqpoll", sqpoll)
+    monkeypatch.setattr(writer, "register_fd", registered.append)
+
+    response = await downloader.run_async(file_data=get_file_data())
+
+    assert response["path"].read_bytes() == content
+    assert bool(registered) is registers
+
+
+class FailingFirstRangeSession(FakeSession):
+    def get(self, url: str, params: dict, headers: dict, timeout: int) -> FakeResponse:
+        response = super().get(url=url, params=params, headers=headers, timeout=timeout)
+        if headers["Range"].startswith("bytes=0-"):
+            return FakeResponse(b"", generation=self.fs.generation, status=403)
+        response.content.delay = 0.01
+        return response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("uring_config", [{}, {"use_uring": True}], ids=["pwrite", "uring"])
+async def test_download_in_parts_stops_writing_when_a_part_fails(
+    tmp_path: Path, uring_config: dict
+):
+    pytest.importorskip("gcsfs")
+    fs = FakeAsyncGcsFileSystem(content=b"A" * 95)
+    fs.session = FailingFirstRangeSession(fs=fs)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, **uring_config)
+
+    with pytest.raises(SourceConnectionNetworkError):
+        await downloader.run_async(file_data=get_file_data())
+    # Likely gets the fd number the failed download just closed
+    other = tmp_path / "other.bin"
+    fd = os.open(other, os.O_WRONLY | os.O_CREAT)
+    try:
+        os.write(fd, b"innocent")
+        await asyncio.sleep(0.1)
+    finally:
+        os.close(fd)
+
+    assert other.read_bytes() == b"innocent"
+    assert not (tmp_path / "file.bin").exists()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_uring_download_waits_for_queued_writes(tmp_path: Path, monkeypatch):
+    pytest.importorskip("gcsfs")
+    fs = FakeAsyncGcsFileSystem(content=b"A" * 8)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, use_uring=True)
+    writer = downloader.uring_writer
+
+    def slow_write(fd: int, buf: bytes, offset: int = 0) -> concurrent.futures.Future:
+        # Stands in for a write still sitting in the ring when its task is cancelled
+        future = concurrent.futures.Future()
+        # Like a queued WriteOp, it can't be cancelled anymore
+        future.set_running_or_notify_cancel()
+
+        def complete() -> None:
+            time.sleep(0.05)
+            try:
+                future.set_result(os.pwrite(fd, buf, offset))
+            except OSError as e:
+                future.set_exception(e)
+
+        threading.Thread(target=complete).start()
+        return future
+
+    monkeypatch.setattr(writer, "write", slow_write)
+    task = asyncio.create_task(downloader.run_async(file_data=get_file_data()))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # Likely gets the fd number the cancelled download just closed
+    other = tmp_path / "other.bin"
+    fd = os.open(other, os.O_WRONLY | os.O_CREAT)
+    try:
+        os.write(fd, b"innocent")
+        await asyncio.sleep(0.1)
+    finally:
+        os.close(fd)
+
+    assert other.read_bytes() == b"innocent"
+    assert not (tmp_path / "file.bin").exists()
+
+
+@pytest.mark.asyncio
+async def test_download_in_parts_pins_indexed_generation(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    content = bytes(range(95))
+    fs = FakeAsyncGcsFileSystem(content=content, generation="7")
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs)
+
+    response = await downloader.run_async(file_data=get_file_data(size=95, generation="7"))
+
+    assert response["path"].read_bytes() == content
+    assert fs.requested_generations == ["7"] * 10
+    assert fs.info_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_download_in_parts_fails_on_overwritten_object(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    # the object grew and got a new generation after it was indexed
+    fs = FakeAsyncGcsFileSystem(content=bytes(range(120)), generation="8")
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs)
+
+    with pytest.raises(SourceConnectionNetworkError):
+        await downloader.run_async(file_data=get_file_data(size=95, generation="7"))
+
+    assert not (tmp_path / "file.bin").exists()
+
+
+@pytest.mark.asyncio
+async def test_get_async_fs(monkeypatch):
+    gcsfs = pytest.importorskip("gcsfs")
+    set_session = AsyncMock()
+    monkeypatch.setattr(gcsfs.GCSFileSystem, "_set_session", set_session)
+    downloader = GcsDownloader(
+        connection_config=GcsConnectionConfig(
+            access_config=GcsAccessConfig(service_account_key="anon")
+        ),
+    )
+
+    fs = await downloader.get_async_fs()
+
+    assert isinstance(fs, gcsfs.GCSFileSystem)
+    assert fs.asynchronous
+    assert await downloader.get_async_fs() is fs
+    set_session.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_objects_limit_is_separate_from_range_requests(tmp_path: Path):
+    downloader = get_downloader(
+        tmp_path=tmp_path, fs=FakeAsyncGcsFileSystem(content=b""), max_concurrency=1
+    )
+
+    semaphore = downloader.get_prefetch_semaphore()
+
+    assert semaphore._value == downloader.download_config.max_concurrent_objects == 8
+
+
+@pytest.mark.asyncio
+async def test_download_small_file_in_one_request(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    content = b"small"
+    fs = FakeAsyncGcsFileSystem(content=content)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs)
+
+    response = await downloader.run_async(file_data=get_file_data())
+
+    assert response["path"].read_bytes() == content
+    assert not fs.ranges
+
+
+@pytest.mark.asyncio
+async def test_download_small_file_with_uring(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    content = b"small"
+    fs = FakeAsyncGcsFileSystem(content=content)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, use_uring=True)
+
+    response = await downloader.run_async(file_data=get_file_data())
+
+    assert response["path"].read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_download_small_file_to_sink(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    content = b"small"
+    fs = FakeAsyncGcsFileSystem(content=content)
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, aggregate_below=8)
+
+    response = await downloader.run_async(file_data=get_file_data())
+    # The index entry is on disk before the sink is closed
+    index_path = response["path"].with_suffix(".index.jsonl")
+    assert json.loads(index_path.read_text())["key"] == "test"
+    downloader.close()
+
+    offset, length = response["byte_range"]
+    assert response["file_data"].local_download_byte_range == (offset, length)
+    assert response["path"].read_bytes()[offset : offset + length] == content
+    assert not (tmp_path / "file.bin").exists()
+
+
+@pytest.mark.asyncio
+async def test_forget_created_dirs_resets_sink(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    fs = FakeAsyncGcsFileSystem(content=b"small")
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, aggregate_below=8)
+
+    first = await downloader.run_async(file_data=get_file_data())
+    sink = downloader.sink
+    shutil.rmtree(tmp_path / "_aggregated")
+    downloader.forget_created_dirs()
+    second = await downloader.run_async(file_data=get_file_data())
+    downloader.close()
+
+    assert sink._fds == []
+    assert second["path"] != first["path"]
+    assert second["path"].read_bytes() == b"small"
+
+
+@pytest.mark.asyncio
+async def test_packed_download_is_found_by_later_runs(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    fs = FakeAsyncGcsFileSystem(content=b"small", generation="1")
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, aggregate_below=8)
+    response = await downloader.run_async(file_data=get_file_data(generation="1"))
+    downloader.close()
+
+    later = get_downloader(tmp_path=tmp_path, fs=fs, aggregate_below=8)
+
+    assert later.get_packed_download(file_data=get_file_data(generation="1")) == (
+        response["path"],
+        response["byte_range"],
+    )
+    assert later.get_packed_download(file_data=get_file_data(generation="2")) is None
+
+
+@pytest.mark.asyncio
+async def test_archives_are_not_packed(tmp_path: Path):
+    pytest.importorskip("gcsfs")
+    fs = FakeAsyncGcsFileSystem(content=b"small")
+    downloader = get_downloader(tmp_path=tmp_path, fs=fs, aggregate_below=8)
+    file_data = get_file_data()
+    file_data.source_identifiers = SourceIdentifiers(
+        filename="file.tar.gz", fullpath="bucket/file.tar.gz", rel_path="file.tar.gz"
+    )
+
+    response = await downloader.run_async(file_data=file_data)
+    downloader.close()
+
+    assert "byte_range" not in response
+    assert response["path"] == tmp_path / "file.tar.gz"
+    assert response["path"].read_bytes() == b"small"
+
+
+class FakeListingGcsFileSystem:
+    def __init__(self, paths: list[str], fail_on: str = None, folder_markers: bool = False):
+        self.paths = paths
+        self.fail_on = fail_on
+        self.folder_markers = folder_markers
+        self.listed = []
+
+    async def _ls(self, path: str, detail: bool) -> list[dict]:
+        self.listed.append(path)
+        if path == self.fail_on:
+            raise OSError(f"failed to list {path}")
+        entries = {}
+        if self.folder_markers:
+            # gcsfs lists a prefix holding a "folder/" marker object as a directory of itself
+            entries[path] = {"name": path, "type": "directory", "size": 0}
+        for file_path in self.paths:
+            if not file_path.startswith(f"{path}/"):
+                continue
+            child, _, rest = file_path[len(path) + 1 :].partition("/")
+            name = f"{path}/{child}"
+            if rest:
+                entries[name] = {"name": name, "type": "directory", "size": 0}
+            else:
+                entries[name] = {"name": name, "type": "file", "size": len(name)}
+        return list(entries.values())
+
+
+def get_indexer(fs: FakeListingGcsFileSystem, **kwargs) -> GcsIndexer:
+    indexer = GcsIndexer(
+        connection_config=GcsConnectionConfig(),
+        index_config=GcsIndexerConfig(remote_url="gs://bucket", recursive=True, **kwargs),
+    )
+
+    async def get_async_fs():
+        return fs
+
+    indexer.get_async_fs = get_async_fs
+    return indexer
+
+
+@pytest.mark.parametrize("folder_markers", [False, True])
+def test_index_parallel_listing(folder_markers: bool):
+    paths = [f"bucket/{i}/{j}/file{k}.txt" for i in range(3) for j in range(4) for k in range(2)]
+    paths.append("bucket/top.txt")
+    fs = FakeListingGcsFileSystem(paths=paths, folder_markers=folder_markers)
+    indexer = get_indexer(fs=fs, parallel_workers=4)
+
+    # run() needs gcsfs, get_file_data() is where the parallel listing is picked
+    files = list(indexer.get_file_data())
+
+    assert sorted(f["name"] for f in files) == sorted(paths)
+    # the root, every first and second level prefix, each listed once
+    assert len(fs.listed) == len(set(fs.listed)) == 1 + 3 + 3 * 4
+
+
+def test_index_parallel_listing_waits_for_consumer():
+    paths = [f"bucket/{i}/file.txt" for i in range(100)]
+    fs = FakeListingGcsFileSystem(paths=paths)
+    indexer = get_indexer(fs=fs, parallel_workers=2)
+
+    files = indexer.list_files_parallel()
+    next(files)
+    # Give the lister time to fill the queue of 2 * parallel_workers pages
+    time.sleep(0.5)
+    listed_while_blocked = len(fs.listed)
+    files.close()
+    for thread in threading.enumerate():
+        if thread.name == "gcs-lister":
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+    # the root, up to 4 queued pages, one page taken and one waiting per worker
+    assert listed_while_blocked <= 1 + 4 + 1 + 2
+
+
+def test_index_parallel_listing_error():
+    paths = [f"bucket/{i}/file.txt" for i in range(3)]
+    fs = FakeListingGcsFileSystem(paths=paths, fail_on="bucket/1")
+    indexer = get_indexer(fs=fs, parallel_workers=2)
+
+    with pytest.raises(OSError, match="failed to list bucket/1"):
+        list(indexer.list_files_parallel())
@@ -0,0 +1,63 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from unstructured_ingest.utils.aggregated_sink import AggregatedDownloadSink, read_byte_range
+
+
+def pack(
+    sink: AggregatedDownloadSink, key: str, data: bytes, version: Optional[str] = None
+) -> tuple[Path, int, int]:
+    # What a downloader does: reserve a range, write it, then commit it to the index
+    fd, shard_path, offset = sink.reserve(length=len(data))
+    os.pwrite(fd, data, offset)
+    sink.commit(key=key, shard_path=shard_path, offset=offset, length=len(data), version=version)
+    return shard_path, offset, len(data)
+
+
+def test_write_and_read_back(tmp_path: Path):
+    sink = AggregatedDownloadSink(base_dir=tmp_path, shard_size=10)
+    contents = {"a": b"aaaa", "b": b"bbbbbb", "c": b"cccccccc"}
+    written = {key: pack(sink=sink, key=key, data=data) for key, data in contents.items()}
+    sink.close()
+
+    for key, (shard_path, offset, length) in written.items():
+        assert read_byte_range(path=shard_path, byte_range=(offset, length)) == contents[key]
+    # "c" doesn't fit in the 10 byte shard holding "a" and "b"
+    assert written["a"][0] == written["b"][0] != written["c"][0]
+
+    index_path = written["a"][0].with_suffix(".index.jsonl")
+    index = [json.loads(line) for line in index_path.read_text().splitlines()]
+    assert index == [
+        {"key": "a", "offset": 0, "length": 4},
+        {"key": "b", "offset": 4, "length": 6},
+    ]
+
+
+def test_oversized_write_gets_own_shard(tmp_path: Path):
+    sink = AggregatedDownloadSink(base_dir=tmp_path, shard_size=4)
+    shard_path, offset, length = pack(sink=sink, key="big", data=b"0123456789")
+    sink.close()
+
+    assert offset == 0
+    assert read_byte_range(path=shard_path, byte_range=(offset, length)) == b"0123456789"
+
+
+def test_lookup_finds_entries_from_earlier_sinks(tmp_path: Path):
+    sink = AggregatedDownloadSink(base_dir=tmp_path)
+    shard_path, offset, length = pack(sink=sink, key="a", data=b"aaaa", version="1")
+    # Only committed ranges are indexed
+    sink.reserve(length=4)
+    sink.close()
+    with shard_path.with_suffix(".index.jsonl").open("a") as index:
+        index.write('{"key": "b", "off')
+
+    sink = AggregatedDownloadSink(base_dir=tmp_path)
+
+    assert sink.lookup(key="a") == (shard_path, offset, length)
+    assert sink.lookup(key="a", version="1") == (shard_path, offset, length)
+    assert sink.lookup(key="a", version="2") is None
+    assert sink.lookup(key="b") is None
+    shard_path.unlink()
+    assert sink.lookup(key="a") is None
@@ -0,0 +1,35 @@
+import pytest
+
+from unstructured_ingest.utils import dep_check
+from unstructured_ingest.utils.dep_check import requires_dependencies
+
+
+def test_requires_dependencies_checks_once(monkeypatch):
+    calls = []
+
+    def dependency_exists(dep: str) -> bool:
+        calls.append(dep)
+        return True
+
+    monkeypatch.setattr(dep_check, "dependency_exists", dependency_exists)
+    monkeypatch.setattr(dep_check, "_checked_dependencies", set())
+
+    @requires_dependencies(["json", "os"])
+    def func():
+        return "ran"
+
+    assert [func() for _ in range(3)] == ["ran"] * 3
+    assert calls == ["json", "os"]
+
+
+def test_requires_dependencies_missing_is_not_cached(monkeypatch):
+    monkeypatch.setattr(dep_check, "dependency_exists", lambda dep: False)
+    monkeypatch.setattr(dep_check, "_checked_dependencies", set())
+
+    @requires_dependencies("missing_dep")
+    def func():
+        return "ran"
+
+    for _ in range(2):
+        with pytest.raises(ImportError):
+            func()
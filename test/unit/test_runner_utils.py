@@ -0,0 +1,50 @@
+import hashlib
+import logging
+from pathlib import Path
+
+from unstructured_ingest.interfaces import ReadConfig
+from unstructured_ingest.runner import utils
+from unstructured_ingest.runner.utils import (
+    update_download_dir_hash,
+    update_download_dir_remote_url,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def test_update_download_dir_remote_url(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    utils._remote_url_dir_name.cache_clear()
+    remote_url = "gs://bucket/prefix"
+
+    download_dirs = [
+        update_download_dir_remote_url(
+            connector_name="gcs", read_config=ReadConfig(), remote_url=remote_url, logger=logger
+        )
+        for _ in range(2)
+    ]
+
+    expected_dir_name = hashlib.sha256(remote_url.encode("utf-8")).hexdigest()[:10]
+    expected = str(tmp_path / ".cache" / "unstructured" / "ingest" / "gcs" / expected_dir_name)
+    assert download_dirs == [expected, expected]
+    assert utils._remote_url_dir_name.cache_info().hits == 1
+    assert download_dirs[0] == update_download_dir_hash(
+        connector_name="gcs",
+        read_config=ReadConfig(),
+        hashed_dir_name=hashlib.sha256(remote_url.encode("utf-8")),
+        logger=logger,
+    )
+
+
+def test_update_download_dir_remote_url_keeps_configured_dir():
+    utils._remote_url_dir_name.cache_clear()
+
+    download_dir = update_download_dir_remote_url(
+        connector_name="gcs",
+        read_config=ReadConfig(download_dir="/tmp/configured"),
+        remote_url="gs://bucket/prefix",
+        logger=logger,
+    )
+
+    assert download_dir == "/tmp/configured"
+    assert utils._remote_url_dir_name.cache_info().misses == 0
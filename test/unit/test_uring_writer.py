@@ -0,0 +1,90 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from unstructured_ingest.utils.uring_writer import UringWriter
+
+
+@pytest.fixture(params=["uring", "sqpoll", "pwrite"])
+def writer(request, monkeypatch):
+    if request.param == "pwrite":
+        monkeypatch.setattr(UringWriter, "_init_ring", lambda self: None)
+    writer = UringWriter(
+        entries=8,
+        max_batch=4,
+        sqpoll=request.param == "sqpoll",
+        registered_buffers=2,
+        buffer_size=10,
+    )
+    if request.param != "pwrite" and not writer.uses_uring:
+        writer.close()
+        pytest.skip("io_uring not available")
+    if request.param == "sqpoll" and not writer.sqpoll:
+        writer.close()
+        pytest.skip("io_uring SQPOLL not permitted")
+    yield writer
+    writer.close()
+
+
+def test_write_at_offsets(writer: UringWriter, tmp_path: Path):
+    path = tmp_path / "out.bin"
+    chunks = [bytes([i]) * 10 for i in range(10)]
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        futures = [writer.write(fd=fd, buf=chunk, offset=i * 10) for i, chunk in enumerate(chunks)]
+        assert [f.result(timeout=5) for f in futures] == [10] * 10
+    finally:
+        os.close(fd)
+    assert path.read_bytes() == b"".join(chunks)
+
+
+def test_write_error_is_raised(writer: UringWriter, tmp_path: Path):
+    path = tmp_path / "out.bin"
+    path.write_bytes(b"")
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        future = writer.write(fd=fd, buf=b"content", offset=0)
+        with pytest.raises(OSError):
+            future.result(timeout=5)
+    finally:
+        os.close(fd)
+
+
+def test_write_registered_fd(writer: UringWriter, tmp_path: Path):
+    paths = [tmp_path / "first.bin", tmp_path / "second.bin"]
+    for i, path in enumerate(paths):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            assert writer.register_fd(fd) is writer.uses_uring
+            writer.write(fd=fd, buf=bytes([i]) * 10, offset=0).result(timeout=5)
+        finally:
+            writer.release_fd(fd)
+            os.close(fd)
+    # the second file likely reused the first one's fd number, so its slot must have been
+    # released rather than still pointing at the first file
+    assert [path.read_bytes() for path in paths] == [b"\x00" * 10, b"\x01" * 10]
+
+
+def test_write_fixed(writer: UringWriter, tmp_path: Path):
+    if not writer.uses_uring:
+        assert writer.acquire_buffer() is None
+        return
+    path = tmp_path / "out.bin"
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        writer.register_fd(fd)
+        buffers = [writer.acquire_buffer(), writer.acquire_buffer()]
+        assert writer.acquire_buffer() is None
+        futures = []
+        for i, (buf_index, buf) in enumerate(buffers):
+            buf[:] = bytes([i]) * 10
+            future = writer.write_fixed(fd=fd, buf_index=buf_index, offset=i * 10)
+            writer.release_buffer(buf_index, after=future)
+            futures.append(future)
+        assert [f.result(timeout=5) for f in futures] == [10, 10]
+    finally:
+        writer.release_fd(fd)
+        os.close(fd)
+    assert path.read_bytes() == b"\x00" * 10 + b"\x01" * 10
+    assert writer.acquire_buffer() is not None
@@ -33,8 +33,9 @@ class GcsAccessConfig(AccessConfig):
         if self.token in ALLOWED_AUTH_VALUES:
             return
         # Case: token as json
-        if isinstance(json_to_dict(self.token), dict):
-            self.token = json_to_dict(self.token)
+        parsed_token = json_to_dict(self.token)
+        if isinstance(parsed_token, dict):
+            self.token = parsed_token
             return
         # Case: path to token
         if Path(self.token).is_file():
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Optional, TextIO
+from uuid import uuid4
+
+
+class AggregatedDownloadSink:
+    """Packs many small downloads into a few large shard files.
+
+    Each shard has an `.index.jsonl` sidecar with one `{"key", "offset", "length"}` entry per
+    packed file, written once its content is complete. Space is reserved under a lock and
+    written outside of it, so concurrent downloads only contend on the offset bookkeeping
+    rather than on open() per file. Entries already in `base_dir` are loaded up front so
+    later runs can find what earlier ones packed.
+    """
+
+    def __init__(self, base_dir: Path, shard_size: int = 2 * 1024**3):
+        self.base_dir = Path(base_dir)
+        self.shard_size = shard_size
+        self._lock = threading.Lock()
+        self._fds: list[int] = []
+        self._indexes: dict[Path, TextIO] = {}
+        self._shard_path: Optional[Path] = None
+        self._offset = 0
+        self._entries: dict[str, tuple[Path, int, int, Optional[str]]] = {}
+        self._load_entries()
+
+    def _load_entries(self) -> None:
+        if not self.base_dir.is_dir():
+            return
+        for index_path in self.base_dir.glob("*.index.jsonl"):
+            shard_path = index_path.with_name(index_path.name[: -len(".index.jsonl")] + ".bin")
+            with index_path.open() as index:
+                for line in index:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Partial last line from an interrupted run
+                        continue
+                    self._entries[entry["key"]] = (
+                        shard_path,
+                        entry["offset"],
+                        entry["length"],
+                        entry.get("version"),
+                    )
+
+    def _new_shard(self) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        # Unique names so concurrent processes and later runs never write to the same shard
+        self._shard_path = self.base_dir / f"shard-{uuid4().hex[:12]}.bin"
+        self._fds.append(os.open(self._shard_path, os.O_WRONLY | os.O_CREAT, 0o644))
+        # Line buffered so every entry is on disk as soon as it's written
+        self._indexes[self._shard_path] = self._shard_path.with_suffix(".index.jsonl").open(
+            "w", buffering=1
+        )
+        self._offset = 0
+
+    def reserve(self, length: int) -> tuple[int, Path, int]:
+        """Reserve `length` bytes, returns the shard fd, shard path and offset to write to.
+        Older shards stay open until close() as writes may still be in flight."""
+        with self._lock:
+            if self._shard_path is None or (
+                self._offset and self._offset + length > self.shard_size
+            ):
+                self._new_shard()
+            offset = self._offset
+            self._offset += length
+            return self._fds[-1], self._shard_path, offset
+
+    def commit(
+        self, key: str, shard_path: Path, offset: int, length: int, version: Optional[str] = None
+    ) -> None:
+        """Record that `key` was fully written to the range reserved for it."""
+        entry = {"key": key, "offset": offset, "length": length}
+        if version is not None:
+            entry["version"] = version
+        with self._lock:
+            self._indexes[shard_path].write(json.dumps(entry) + "\n")
+            self._entries[key] = (shard_path, offset, length, version)
+
+    def lookup(self, key: str, version: Optional[str] = None) -> Optional[tuple[Path, int, int]]:
+        """Where `key` was packed, if it was and its shard is still there. When both sides
+        know the version of the content, they have to match."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        shard_path, offset, length, packed_version = entry
+        if version is not None and packed_version is not None and version != packed_version:
+            return None
+        if not shard_path.exists():
+            return None
+        return shard_path, offset, length
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in self._fds:
+                os.close(fd)
+            self._fds = []
+            for index in self._indexes.values():
+                index.close()
+            self._indexes = {}
+            self._shard_path = None
+
+
+def read_byte_range(path: Path, byte_range: tuple[int, int]) -> bytes:
+    """Read `(offset, length)` out of a shard written by AggregatedDownloadSink."""
+    offset, length = byte_range
+    if not length:
+        return b""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return m[offset : offset + length]
@@ -15,6 +15,10 @@ from typing_extensions import ParamSpec
 _T = TypeVar("_T")
 _P = ParamSpec("_P")
 
+# Dependency sets already found to be installed, so hot decorated methods (e.g. a
+# downloader's run_async called once per file) only pay for the import check once
+_checked_dependencies: set[tuple[str, ...]] = set()
+
 
 def requires_dependencies(
     dependencies: str | list[str],
@@ -34,9 +38,12 @@ def requires_dependencies(
     """
     if isinstance(dependencies, str):
         dependencies = [dependencies]
+    dependencies_key = tuple(dependencies)
 
     def decorator(func: Callable[_P, _T]) -> Callable[_P, _T]:
         def run_check():
+            if dependencies_key in _checked_dependencies:
+                return
             missing_deps: List[str] = []
             for dep in dependencies:
                 if not dependency_exists(dep):
@@ -50,6 +57,7 @@ def requires_dependencies(
                         else f"Please install them using `pip install {' '.join(missing_deps)}`."
                     ),
                 )
+            _checked_dependencies.add(dependencies_key)
 
         @wraps(func)
         def wrapper(*args: _P.args, **kwargs: _P.kwargs):
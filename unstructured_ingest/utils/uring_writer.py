@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+
+from unstructured_ingest.v2.logger import logger
+
+
+@dataclass
+class WriteOp:
+    fd: int
+    buf: bytes
+    offset: int
+    # Index of buf in the registered buffers, for writes of a full registered buffer
+    buf_index: Optional[int] = None
+    future: Future = field(default_factory=Future)
+
+    def __post_init__(self):
+        # A queued write can't be taken back, so cancelling e.g. an asyncio wrapper of the
+        # future must not mark it done while the kernel may still read from buf
+        self.future.set_running_or_notify_cancel()
+
+
+class UringWriter:
+    """Writes buffers to local files through a single io_uring owned by a background thread.
+
+    Queued writes are drained in batches of at most `max_batch`, so a batch costs one
+    submit syscall rather than one write syscall per buffer. When io_uring can't be used
+    (not Linux, kernel older than 5.6, `liburing` not installed) writes fall back to
+    `os.pwrite` on the calling thread.
+
+    Descriptors passed to `register_fd` are written through the ring's fixed file table,
+    saving the per-write file lookup. With `registered_buffers`, that many buffers of
+    `buffer_size` bytes are registered with the ring; a buffer taken with `acquire_buffer`
+    and filled completely is written with `write_fixed`, which skips pinning its pages on
+    every write. With `sqpoll` the ring is set up with `IORING_SETUP_SQPOLL`, a kernel thread
+    polls the submission queue so submitting doesn't need a syscall while it's awake. If the
+    kernel refuses SQPOLL a regular ring is used.
+    """
+
+    def __init__(
+        self,
+        entries: int = 256,
+        max_batch: int = 32,
+        sqpoll: bool = False,
+        registered_files: int = 64,
+        registered_buffers: int = 0,
+        buffer_size: int = 1024 * 1024,
+    ):
+        self.entries = entries
+        self.max_batch = min(max_batch, entries)
+        self.sqpoll = sqpoll
+        self.buffer_size = buffer_size
+        self._queue: queue.Queue[Optional[WriteOp]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._fixed_files: dict[int, int] = {}
+        self._free_slots: list[int] = []
+        self._files_lock = threading.Lock()
+        self._buffers: list[bytearray] = []
+        self._iovecs = None
+        self._free_buffers: queue.SimpleQueue[int] = queue.SimpleQueue()
+        self._ring = self._init_ring()
+        if self._ring is not None:
+            self._init_fixed_files(registered_files)
+            if registered_buffers:
+                self._init_buffers(registered_buffers)
+            self._thread = threading.Thread(target=self._drain, name="uring-writer", daemon=True)
+            self._thread.start()
+
+    @property
+    def uses_uring(self) -> bool:
+        return self._ring is not None
+
+    def _init_ring(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            from liburing import IORING_SETUP_SQPOLL, Ring, io_uring_queue_init
+        except ImportError:
+            logger.debug(
+                "liburing not installed (unstructured-ingest[gcs-uring]), "
+                "writing downloads with os.pwrite"
+            )
+            return None
+        if self.sqpoll:
+            ring = Ring()
+            try:
+                io_uring_queue_init(self.entries, ring, IORING_SETUP_SQPOLL)
+                return ring
+            except OSError as e:
+                # Kernels before 5.11 only allow SQPOLL with CAP_SYS_ADMIN
+                logger.debug(f"failed to set up io_uring with SQPOLL, using a regular ring: {e}")
+                self.sqpoll = False
+        ring = Ring()
+        try:
+            io_uring_queue_init(self.entries, ring)
+        except OSError as e:
+            logger.debug(f"failed to set up io_uring, writing downloads with os.pwrite: {e}")
+            return None
+        return ring
+
+    def _init_fixed_files(self, registered_files: int) -> None:
+        from liburing import io_uring_register_files_sparse
+
+        try:
+            io_uring_register_files_sparse(self._ring, registered_files)
+        except OSError as e:
+            logger.debug(f"failed to register io_uring file table, using plain fds: {e}")
+            return
+        self._free_slots = list(range(registered_files - 1, -1, -1))
+
+    def _init_buffers(self, registered_buffers: int) -> None:
+        from liburing import Iovec, io_uring_register_buffers
+
+        # The bindings only accept bytearrays for fixed writes, and write all of it, so
+        # buffers are only written once full
+        buffers = [bytearray(self.buffer_size) for _ in range(registered_buffers)]
+        # The ring holds the addresses, keep both alive for as long as it is open
+        iovecs = Iovec(buffers)
+        try:
+            io_uring_register_buffers(self._ring, iovecs)
+        except OSError as e:
+            # Pinned buffers count against RLIMIT_MEMLOCK on older kernels
+            logger.debug(f"failed to register io_uring buffers, using regular writes: {e}")
+            return
+        self._buffers, self._iovecs = buffers, iovecs
+        for i in range(registered_buffers):
+            self._free_buffers.put(i)
+
+    def acquire_buffer(self) -> Optional[tuple[int, bytearray]]:
+        """Take a free registered buffer, returns None rather than waiting if there isn't
+        one. Give it back with `release_buffer`."""
+        try:
+            buf_index = self._free_buffers.get_nowait()
+        except queue.Empty:
+            return None
+        return buf_index, self._buffers[buf_index]
+
+    def release_buffer(self, buf_index: int, after: Optional[Future] = None) -> None:
+        """Return a buffer to the pool, once `after` (its last write) is done."""
+        if after is not None and not after.done():
+            after.add_done_callback(lambda _: self._free_buffers.put(buf_index))
+        else:
+            self._free_buffers.put(buf_index)
+
+    def write_fixed(self, fd: int, buf_index: int, offset: int = 0) -> Future:
+        """Queue the whole of registered buffer `buf_index` to be written to `fd` at `offset`,
+        the buffer must not be modified until the future is done."""
+        op = WriteOp(fd=fd, buf=self._buffers[buf_index], offset=offset, buf_index=buf_index)
+        self._queue.put(op)
+        return op.future
+
+    def _update_fixed_file(self, slot: int, fd: int) -> None:
+        from liburing import FileIndex, io_uring_register_files_update
+
+        io_uring_register_files_update(self._ring, FileIndex([fd]), slot)
+
+    def register_fd(self, fd: int) -> bool:
+        """Write to `fd` through the fixed file table until `release_fd` is called, returns
+        False if it wasn't registered (no ring or the table is full). `release_fd` must
+        be called before the fd is closed, since the number may be reused for another file."""
+        with self._files_lock:
+            if fd in self._fixed_files:
+                return True
+            if not self._free_slots:
+                return False
+            slot = self._free_slots.pop()
+            try:
+                self._update_fixed_file(slot=slot, fd=fd)
+            except OSError as e:
+                self._free_slots.append(slot)
+                logger.debug(f"failed to register fd {fd} with io_uring: {e}")
+                return False
+            self._fixed_files[fd] = slot
+            return True
+
+    def release_fd(self, fd: int) -> None:
+        with self._files_lock:
+            slot = self._fixed_files.pop(fd, None)
+            if slot is None:
+                return
+            try:
+                self._update_fixed_file(slot=slot, fd=-1)
+            except OSError as e:
+                # Leave the slot out of the free list, it still points at the old file
+                logger.debug(f"failed to release io_uring slot for fd {fd}: {e}")
+                return
+            self._free_slots.append(slot)
+
+    def write(self, fd: int, buf: bytes, offset: int = 0) -> Future:
+        """Queue `buf` to be written to `fd` at `offset`, the future resolves to the number of
+        bytes written."""
+        op = WriteOp(fd=fd, buf=buf, offset=offset)
+        if self._ring is None:
+            try:
+                op.future.set_result(self._pwrite(op))
+            except OSError as e:
+                op.future.set_exception(e)
+            return op.future
+        self._queue.put(op)
+        return op.future
+
+    @staticmethod
+    def _pwrite(op: WriteOp) -> int:
+        view = memoryview(op.buf)
+        written = 0
+        while written < len(view):
+            written += os.pwrite(op.fd, view[written:], op.offset + written)
+        return written
+
+    def _next_batch(self) -> tuple[list[WriteOp], bool]:
+        op = self._queue.get()
+        if op is None:
+            return [], True
+        batch = [op]
+        while len(batch) < self.max_batch:
+            try:
+                op = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is None:
+                return batch, True
+            batch.append(op)
+        return batch, False
+
+    def _drain(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._submit(batch)
+            except Exception as e:
+                for op in batch:
+                    if not op.future.done():
+                        op.future.set_exception(e)
+
+    def _submit(self, batch: list[WriteOp]) -> None:
+        from liburing import (
+            IOSQE_FIXED_FILE,
+            Cqe,
+            io_uring_cqe_seen,
+            io_uring_get_sqe,
+            io_uring_prep_write,
+            io_uring_prep_write_fixed,
+            io_uring_sqe_set_data64,
+            io_uring_sqe_set_flags,
+            io_uring_submit,
+            io_uring_wait_cqe,
+        )
+
+        # (op, bytes already written, buffer submitted) for every write still in flight. The
+        # bindings only hand the kernel a pointer, so the submitted buffer (a copy of the
+        # remainder after a short write) must stay referenced until its completion is reaped
+        pending = {i: (op, 0, op.buf) for i, op in enumerate(batch)}
+        with self._files_lock:
+            slots = {op.fd: self._fixed_files[op.fd] for op in batch if op.fd in self._fixed_files}
+        cqe = Cqe()
+        while pending:
+            for i, (op, written, buf) in pending.items():
+                sqe = io_uring_get_sqe(self._ring)
+                slot = slots.get(op.fd)
+                fd = op.fd if slot is None else slot
+                if op.buf_index is not None and not written:
+                    io_uring_prep_write_fixed(sqe, fd, buf, op.buf_index, op.offset)
+                else:
+                    # The remainder of a short fixed write is a copy outside the registered
+                    # buffer, so it goes through a regular write
+                    io_uring_prep_write(sqe, fd, buf, op.offset + written)
+                if slot is not None:
+                    io_uring_sqe_set_flags(sqe, IOSQE_FIXED_FILE)
+                io_uring_sqe_set_data64(sqe, i)
+            io_uring_submit(self._ring)
+            resubmit = {}
+            for _ in range(len(pending)):
+                io_uring_wait_cqe(self._ring, cqe)
+                entry = cqe[0]
+                i, res = entry.user_data, entry.res
+                io_uring_cqe_seen(self._ring, entry)
+                op, written, _ = pending[i]
+                if res < 0:
+                    op.future.set_exception(OSError(-res, os.strerror(-res)))
+                elif res == 0:
+                    op.future.set_exception(OSError(f"no progress writing to fd {op.fd}"))
+                elif written + res < len(op.buf):
+                    # Short write, submit the remainder with the next round
+                    resubmit[i] = (op, written + res, op.buf[written + res :])
+                else:
+                    op.future.set_result(len(op.buf))
+            pending = resubmit
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._ring is not None:
+            from liburing import io_uring_queue_exit
+
+            # Exiting the ring also drops its fixed file table
+            io_uring_queue_exit(self._ring)
+            self._ring = None
+            self._fixed_files.clear()
+            self._free_slots = []
+            self._buffers, self._iovecs = [], None
+            self._free_buffers = queue.SimpleQueue()
+
+
+_writers: dict[tuple[bool, int, int], UringWriter] = {}
+_writer_pid: Optional[int] = None
+_writer_lock = threading.Lock()
+
+
+def get_uring_writer(
+    sqpoll: bool = False, registered_buffers: int = 0, buffer_size: int = 1024 * 1024
+) -> UringWriter:
+    """Process wide writer (one per ring setup), recreated after a fork since the ring and
+    its thread don't survive one."""
+    global _writer_pid
+    key = (sqpoll, registered_buffers, buffer_size)
+    with _writer_lock:
+        if _writer_pid != os.getpid():
+            _writers.clear()
+            _writer_pid = os.getpid()
+        if key not in _writers:
+            _writers[key] = UringWriter(
+                sqpoll=sqpoll, registered_buffers=registered_buffers, buffer_size=buffer_size
+            )
+        return _writers[key]
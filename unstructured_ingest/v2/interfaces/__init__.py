@@ -1,5 +1,11 @@
 from .connector import AccessConfig, BaseConnector, ConnectionConfig
-from .downloader import Downloader, DownloaderConfig, DownloadResponse, download_responses
+from .downloader import (
+    Downloader,
+    DownloaderConfig,
+    DownloadResponse,
+    PrefetchingDownloader,
+    download_responses,
+)
 from .file_data import FileData, FileDataSourceMetadata, SourceIdentifiers
 from .indexer import Indexer, IndexerConfig
 from .process import BaseProcess
@@ -12,6 +18,7 @@ __all__ = [
     "download_responses",
     "Downloader",
     "DownloaderConfig",
+    "PrefetchingDownloader",
     "FileData",
     "Indexer",
     "IndexerConfig",
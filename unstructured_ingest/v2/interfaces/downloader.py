@@ -1,14 +1,22 @@
+import asyncio
 import os
 from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional, TypedDict, TypeVar, Union
+from typing import Any, AsyncIterator, Iterable, Optional, TypedDict, TypeVar, Union
 
 from pydantic import BaseModel, Field
+from typing_extensions import NotRequired
 
 from unstructured_ingest.v2.interfaces.connector import BaseConnector
-from unstructured_ingest.v2.interfaces.file_data import FileData
+from unstructured_ingest.v2.interfaces.file_data import FileData, FileDataSourceMetadata
 from unstructured_ingest.v2.interfaces.process import BaseProcess
 
+DEFAULT_DOWNLOAD_ROOT = os.path.normpath(
+    os.path.join(os.path.expanduser("~"), ".cache", "unstructured", "ingest", "download")
+)
+
 
 class DownloaderConfig(BaseModel):
     download_dir: Optional[Path] = Field(
@@ -24,6 +32,8 @@ DownloaderConfigT = TypeVar("DownloaderConfigT", bound=DownloaderConfig)
 class DownloadResponse(TypedDict):
     file_data: FileData
     path: Path
+    # (offset, length) of the content within path when it was packed into a shared file
+    byte_range: NotRequired[tuple[int, int]]
 
 
 download_responses = Union[list[DownloadResponse], DownloadResponse]
@@ -32,6 +42,9 @@ download_responses = Union[list[DownloadResponse], DownloadResponse]
 class Downloader(BaseProcess, BaseConnector, ABC):
     connector_type: str
     download_config: DownloaderConfigT
+    # Caches set on first use, Downloader isn't a dataclass so these don't become fields
+    _created_dirs: Optional[set[str]] = None
+    _download_dir_cache: Optional[tuple[Path, str]] = None
 
     def get_download_path(self, file_data: FileData) -> Optional[Path]:
         if not file_data.source_identifiers:
@@ -39,51 +52,124 @@ class Downloader(BaseProcess, BaseConnector, ABC):
         rel_path = file_data.source_identifiers.relative_path
         if not rel_path:
             return None
-        rel_path = rel_path[1:] if rel_path.startswith("/") else rel_path
-        return self.download_dir / Path(rel_path)
+        # Join as strings and only build a Path at the end, this runs once per indexed file
+        return Path(os.path.join(self._download_dir_str, rel_path.lstrip("/")))
+
+    def ensure_parent_dir(self, download_path: Path) -> None:
+        """Create the parent directory of `download_path`, at most once per directory for the
+        lifetime of the downloader rather than a makedirs() probe per downloaded file."""
+        parent = os.path.dirname(download_path)
+        if self._created_dirs is None:
+            self._created_dirs = set()
+        if parent not in self._created_dirs:
+            os.makedirs(parent, exist_ok=True)
+            self._created_dirs.add(parent)
+
+    def forget_created_dirs(self) -> None:
+        """Call when download directories were removed, e.g. once the download cache is
+        deleted, so they are created again on the next download."""
+        self._created_dirs = None
+
+    def get_packed_download(self, file_data: FileData) -> Optional[tuple[Path, tuple[int, int]]]:
+        """Shared file and `(offset, length)` the content of `file_data` was packed into by an
+        earlier download, if the downloader packs small files together."""
+        return None
 
     @staticmethod
-    def is_float(value: str):
+    def _parse_times(metadata: FileDataSourceMetadata) -> Optional[tuple[float, float]]:
         try:
-            float(value)
-            return True
-        except ValueError:
-            return False
+            return float(metadata.date_created), float(metadata.date_modified)
+        except (TypeError, ValueError):
+            return None
 
     def generate_download_response(
-        self, file_data: FileData, download_path: Path
+        self,
+        file_data: FileData,
+        download_path: Path,
+        byte_range: Optional[tuple[int, int]] = None,
     ) -> DownloadResponse:
-        if (
-            file_data.metadata.date_modified
-            and self.is_float(file_data.metadata.date_modified)
-            and file_data.metadata.date_created
-            and self.is_float(file_data.metadata.date_created)
-        ):
-            date_modified = float(file_data.metadata.date_modified)
-            date_created = float(file_data.metadata.date_created)
-            os.utime(download_path, times=(date_created, date_modified))
         file_data.local_download_path = str(download_path.resolve())
+        if byte_range is not None:
+            # The file is shared with other downloads, so its timestamps aren't ours to set
+            file_data.local_download_byte_range = byte_range
+            return DownloadResponse(file_data=file_data, path=download_path, byte_range=byte_range)
+        if times := self._parse_times(file_data.metadata):
+            os.utime(download_path, times=times)
         return DownloadResponse(file_data=file_data, path=download_path)
 
+    def generate_download_responses_bulk(
+        self, downloads: list[tuple[FileData, Path]]
+    ) -> list[DownloadResponse]:
+        return [
+            self.generate_download_response(
+                file_data=file_data,
+                download_path=download_path,
+                byte_range=file_data.local_download_byte_range,
+            )
+            for file_data, download_path in downloads
+        ]
+
     @property
     def download_dir(self) -> Path:
         if self.download_config.download_dir is None:
-            self.download_config.download_dir = (
-                Path.home()
-                / ".cache"
-                / "unstructured"
-                / "ingest"
-                / "download"
-                / self.connector_type
-            ).resolve()
+            self.download_config.download_dir = Path(
+                os.path.join(DEFAULT_DOWNLOAD_ROOT, self.connector_type)
+            )
+            self.download_config.download_dir.mkdir(parents=True, exist_ok=True)
         return self.download_config.download_dir
 
+    @property
+    def _download_dir_str(self) -> str:
+        download_dir = self.download_dir
+        if self._download_dir_cache is None or self._download_dir_cache[0] is not download_dir:
+            self._download_dir_cache = (download_dir, str(download_dir))
+        return self._download_dir_cache[1]
+
     def is_async(self) -> bool:
         return True
 
+    def close(self) -> None:
+        """Release anything held open across downloads, called once the download step is
+        done with this downloader."""
+        pass
+
     @abstractmethod
     def run(self, file_data: FileData, **kwargs: Any) -> download_responses:
         pass
 
     async def run_async(self, file_data: FileData, **kwargs: Any) -> download_responses:
-        return self.run(file_data=file_data, **kwargs)
+        # Run the blocking download in a worker thread so concurrent downloads
+        # don't serialize on the event loop
+        return await asyncio.to_thread(self.run, file_data=file_data, **kwargs)
+
+
+@dataclass
+class PrefetchingDownloader:
+    """Wraps a downloader to keep up to `slots` downloads in flight ahead of the consumer, so
+    fetching the next files overlaps with whatever is done with the current one."""
+
+    downloader: Downloader
+    slots: int = 2
+
+    def __post_init__(self):
+        if self.slots < 1:
+            raise ValueError(f"slots must be at least 1: {self.slots}")
+
+    async def iter_prefetched(
+        self, file_datas: Iterable[FileData], **kwargs: Any
+    ) -> AsyncIterator[download_responses]:
+        """Yield download responses in the order of `file_datas`."""
+        pending: deque[asyncio.Task] = deque()
+        try:
+            for file_data in file_datas:
+                pending.append(
+                    asyncio.create_task(self.downloader.run_async(file_data=file_data, **kwargs))
+                )
+                if len(pending) > self.slots:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # Consumer stopped early or a download failed, don't leave downloads running
+            for task in pending:
+                task.cancel()
@@ -43,6 +43,8 @@ class FileData(DataClassJsonMixin):
     additional_metadata: dict[str, Any] = field(default_factory=dict)
     reprocess: bool = False
     local_download_path: Optional[str] = None
+    # (offset, length) within local_download_path when the content was packed into a shard
+    local_download_byte_range: Optional[tuple[int, int]] = None
 
     @classmethod
     def from_file(cls, path: str) -> "FileData":
@@ -3,13 +3,14 @@ import hashlib
 import json
 import shutil
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Callable, Optional, TypedDict, TypeVar
+from typing import Any, Callable, Optional, TypedDict, TypeVar
 
 from unstructured_ingest.v2.interfaces import FileData, download_responses
 from unstructured_ingest.v2.interfaces.downloader import Downloader
 from unstructured_ingest.v2.logger import logger
-from unstructured_ingest.v2.pipeline.interfaces import PipelineStep
+from unstructured_ingest.v2.pipeline.interfaces import PipelineStep, iterable_input
 from unstructured_ingest.v2.utils import serialize_base_model_json
 
 DownloaderT = TypeVar("DownloaderT", bound=Downloader)
@@ -44,13 +45,18 @@ class DownloadStep(PipelineStep):
             f"connection configs: {connection_config}"
         )
 
+    def __call__(self, iterable: Optional[iterable_input] = None) -> Any:
+        try:
+            return super().__call__(iterable=iterable)
+        finally:
+            self.process.close()
+
     @staticmethod
-    def is_float(value: str):
+    def _parse_date_modified(file_data: FileData) -> Optional[float]:
         try:
-            float(value)
-            return True
-        except ValueError:
-            return False
+            return float(file_data.metadata.date_modified)
+        except (TypeError, ValueError):
+            return None
 
     def should_download(self, file_data: FileData, file_data_path: str) -> bool:
         if self.context.re_download:
@@ -58,11 +64,11 @@ class DownloadStep(PipelineStep):
         download_path = self.process.get_download_path(file_data=file_data)
         if not download_path or not download_path.exists():
             return True
+        date_modified = self._parse_date_modified(file_data)
         if (
-            download_path.is_file()
-            and file_data.metadata.date_modified
-            and self.is_float(file_data.metadata.date_modified)
-            and download_path.stat().st_mtime > float(file_data.metadata.date_modified)
+            date_modified is not None
+            and download_path.is_file()
+            and download_path.stat().st_mtime > date_modified
         ):
             # Also update file data to mark this to reprocess since this won't change the filename
             file_data.reprocess = True
@@ -71,10 +77,15 @@ class DownloadStep(PipelineStep):
         return False
 
     def update_file_data(
-        self, file_data: FileData, file_data_path: Path, download_path: Path
+        self,
+        file_data: FileData,
+        file_data_path: Path,
+        download_path: Path,
+        byte_range: Optional[tuple[int, int]] = None,
     ) -> None:
         file_data.local_download_path = str(download_path.resolve())
-        file_size_bytes = download_path.stat().st_size
+        file_data.local_download_byte_range = byte_range
+        file_size_bytes = byte_range[1] if byte_range else download_path.stat().st_size
         if not file_data.metadata.filesize_bytes and file_size_bytes:
             file_data.metadata.filesize_bytes = file_size_bytes
         if (
@@ -93,6 +104,18 @@ class DownloadStep(PipelineStep):
 
     async def _run_async(self, fn: Callable, file_data_path: str) -> list[DownloadStepResponse]:
         file_data = FileData.from_file(path=file_data_path)
+        if not self.context.re_download and (
+            packed := self.process.get_packed_download(file_data=file_data)
+        ):
+            download_path, byte_range = packed
+            logger.debug(f"skipping download, file already packed locally in {download_path}")
+            self.update_file_data(
+                file_data=file_data,
+                file_data_path=Path(file_data_path),
+                download_path=download_path,
+                byte_range=byte_range,
+            )
+            return [DownloadStepResponse(file_data_path=file_data_path, path=str(download_path))]
         download_path = self.process.get_download_path(file_data=file_data)
         if not self.should_download(file_data=file_data, file_data_path=file_data_path):
             logger.debug(f"skipping download, file already exists locally: {download_path}")
@@ -132,6 +155,7 @@ class DownloadStep(PipelineStep):
                     file_data=file_data,
                     file_data_path=Path(file_data_path),
                     download_path=download_path,
+                    byte_range=download_results.get("byte_range"),
                 )
                 responses = [
                     DownloadStepResponse(file_data_path=file_data_path, path=str(download_path))
@@ -143,6 +167,7 @@ class DownloadStep(PipelineStep):
                     file_data=file_data,
                     file_data_path=Path(file_data_path),
                     download_path=download_path,
+                    byte_range=download_results.get("byte_range"),
                 )
                 responses = [
                     DownloadStepResponse(
@@ -159,6 +184,7 @@ class DownloadStep(PipelineStep):
                     file_data=file_data,
                     file_data_path=Path(file_data_path),
                     download_path=download_path,
+                    byte_range=res.get("byte_range"),
                 )
                 responses.append(
                     DownloadStepResponse(file_data_path=file_data_path, path=res["path"])
@@ -175,7 +201,9 @@ class DownloadStep(PipelineStep):
             json.dump(file_data.to_dict(), f, indent=2)
         return str(filepath)
 
-    def get_hash(self, extras: Optional[list[str]]) -> str:
+    @cached_property
+    def hashable_config(self) -> str:
+        # Configs don't change over a run, serialize them once rather than per file
         download_config_dict = json.loads(
             serialize_base_model_json(model=self.process.download_config)
         )
@@ -186,7 +214,10 @@ class DownloadStep(PipelineStep):
             "download_config": download_config_dict,
             "connection_config": connection_config_dict,
         }
-        hashable_string = json.dumps(hashable_dict, sort_keys=True)
+        return json.dumps(hashable_dict, sort_keys=True)
+
+    def get_hash(self, extras: Optional[list[str]]) -> str:
+        hashable_string = self.hashable_config
         if extras:
             hashable_string += "".join(extras)
         return hashlib.sha256(hashable_string.encode()).hexdigest()[:12]
@@ -204,3 +235,4 @@ class DownloadStep(PipelineStep):
             cache_dir = self.cache_dir
             logger.info(f"deleting {self.identifier} cache dir {cache_dir}")
             shutil.rmtree(cache_dir)
+            self.process.forget_created_dirs()
@@ -2,6 +2,7 @@ import asyncio
 import hashlib
 import json
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Callable, Optional, TypedDict
 
@@ -69,10 +70,14 @@ class EmbedStep(PipelineStep):
         )
         return EmbedStepResponse(file_data_path=file_data_path, path=str(output_filepath))
 
-    def get_hash(self, extras: Optional[list[str]]) -> str:
-        hashable_string = serialize_base_model_json(
+    @cached_property
+    def hashable_config(self) -> str:
+        return serialize_base_model_json(
             model=self.process.config, sort_keys=True, ensure_ascii=True
         )
+
+    def get_hash(self, extras: Optional[list[str]]) -> str:
+        hashable_string = self.hashable_config
         if extras:
             hashable_string += "".join(extras)
         return hashlib.sha256(hashable_string.encode()).hexdigest()[:12]
@@ -1,6 +1,7 @@
 import hashlib
 import json
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Generator, Optional, TypeVar
 
 from unstructured_ingest.v2.interfaces.indexer import Indexer
@@ -52,7 +53,8 @@ class IndexStep(PipelineStep):
                     raise e
                 continue
 
-    def get_hash(self, extras: Optional[list[str]]) -> str:
+    @cached_property
+    def hashable_config(self) -> str:
         index_config_dict = json.loads(
             serialize_base_model_json(model=self.process.index_config, sort_keys=True)
         )
@@ -63,7 +65,10 @@ class IndexStep(PipelineStep):
             "index_config": index_config_dict,
             "connection_config": connection_config_dict,
         }
-        hashable_string = json.dumps(hashable_dict, sort_keys=True)
+        return json.dumps(hashable_dict, sort_keys=True)
+
+    def get_hash(self, extras: Optional[list[str]]) -> str:
+        hashable_string = self.hashable_config
         if extras:
             hashable_string += "".join(extras)
         return hashlib.sha256(hashable_string.encode()).hexdigest()[:12]
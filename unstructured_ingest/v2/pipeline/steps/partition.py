@@ -2,6 +2,7 @@ import asyncio
 import hashlib
 import json
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Callable, Optional, TypedDict
 
@@ -57,6 +58,10 @@ class PartitionStep(PipelineStep):
             logger.debug(f"skipping partitioning, output already exists: {output_filepath}")
             return PartitionStepResponse(file_data_path=file_data_path, path=str(output_filepath))
         fn_kwargs = {"filename": path, "metadata": file_data.metadata.to_dict()}
+        if byte_range := file_data.local_download_byte_range:
+            # Content was packed into a shared file, the partitioner reads just its slice
+            fn_kwargs["byte_range"] = byte_range
+            fn_kwargs["metadata_filename"] = file_data.source_identifiers.filename
         if not asyncio.iscoroutinefunction(fn):
             partitioned_content = fn(**fn_kwargs)
         elif semaphore := self.context.semaphore:
@@ -69,10 +74,14 @@ class PartitionStep(PipelineStep):
         )
         return PartitionStepResponse(file_data_path=file_data_path, path=str(output_filepath))
 
-    def get_hash(self, extras: Optional[list[str]]) -> str:
-        hashable_string = serialize_base_model_json(
+    @cached_property
+    def hashable_config(self) -> str:
+        return serialize_base_model_json(
             model=self.process.config, sort_keys=True, ensure_ascii=True
         )
+
+    def get_hash(self, extras: Optional[list[str]]) -> str:
+        hashable_string = self.hashable_config
         if extras:
             hashable_string += "".join(extras)
         return hashlib.sha256(hashable_string.encode()).hexdigest()[:12]
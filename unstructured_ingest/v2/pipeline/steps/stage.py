@@ -1,6 +1,7 @@
 import asyncio
 import hashlib
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Callable, Optional, TypedDict
 
@@ -54,10 +55,14 @@ class UploadStageStep(PipelineStep):
             staged_output_path = await fn(**fn_kwargs)
         return UploadStageStepResponse(file_data_path=file_data_path, path=str(staged_output_path))
 
-    def get_hash(self, extras: Optional[list[str]]) -> str:
-        hashable_string = serialize_base_model_json(
+    @cached_property
+    def hashable_config(self) -> str:
+        return serialize_base_model_json(
             model=self.process.upload_stager_config, sort_keys=True, ensure_ascii=True
         )
+
+    def get_hash(self, extras: Optional[list[str]]) -> str:
+        hashable_string = self.hashable_config
         if extras:
             hashable_string += "".join(extras)
         return hashlib.sha256(hashable_string.encode()).hexdigest()[:12]
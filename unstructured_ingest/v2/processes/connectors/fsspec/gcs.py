@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 from time import time
-from typing import Any, Generator, Optional, Union
+from typing import TYPE_CHECKING, Any, Generator, Iterable, Optional, Union
 
 from dateutil import parser
 from pydantic import Field, Secret
 
+from unstructured_ingest.error import SourceConnectionNetworkError
+from unstructured_ingest.utils.aggregated_sink import AggregatedDownloadSink
+from unstructured_ingest.utils.compression import TAR_FILE_EXT, ZIP_FILE_EXT
 from unstructured_ingest.utils.dep_check import requires_dependencies
 from unstructured_ingest.utils.string_and_date_utils import json_to_dict
+from unstructured_ingest.utils.uring_writer import UringWriter, get_uring_writer
 from unstructured_ingest.v2.interfaces import DownloadResponse, FileData, FileDataSourceMetadata
+from unstructured_ingest.v2.logger import logger
 from unstructured_ingest.v2.processes.connector_registry import (
     DestinationRegistryEntry,
     SourceRegistryEntry,
@@ -26,11 +36,33 @@ from unstructured_ingest.v2.processes.connectors.fsspec.fsspec import (
     FsspecUploaderConfig,
 )
 
+if TYPE_CHECKING:
+    from aiohttp import StreamReader
+    from gcsfs import GCSFileSystem
+
 CONNECTOR_TYPE = "gcs"
+# Shared by every connection config instead of building a new list per instance
+GCS_PROTOCOLS = ("gs", "gcs")
+ARCHIVE_FILE_EXT = tuple(TAR_FILE_EXT + ZIP_FILE_EXT)
+
+
+def put_page(pages: queue.Queue, stop: threading.Event, page: Any) -> None:
+    """Put `page` once there is room for it, or give up once the consumer stopped reading."""
+    while not stop.is_set():
+        try:
+            pages.put(page, timeout=0.1)
+            return
+        except queue.Full:
+            continue
 
 
 class GcsIndexerConfig(FsspecIndexerConfig):
-    pass
+    parallel_workers: int = Field(
+        default=8,
+        description="Number of prefixes listed concurrently when indexing recursively, "
+        "sub-prefixes found by one worker are picked up by whichever worker is idle. "
+        "1 lists the bucket sequentially.",
+    )
 
 
 service_account_key_description = """
@@ -76,8 +108,9 @@ class GcsAccessConfig(FsspecAccessConfig):
             return
 
         # Case: token as json
-        if isinstance(json_to_dict(self.service_account_key), dict):
-            self.token = json_to_dict(self.service_account_key)
+        parsed_key = json_to_dict(self.service_account_key)
+        if isinstance(parsed_key, dict):
+            self.token = parsed_key
             return
 
         # Case: path to token
@@ -89,7 +122,7 @@ class GcsAccessConfig(FsspecAccessConfig):
 
 
 class GcsConnectionConfig(FsspecConnectionConfig):
-    supported_protocols: list[str] = field(default_factory=lambda: ["gs", "gcs"], init=False)
+    supported_protocols: tuple[str, ...] = Field(default=GCS_PROTOCOLS, init=False)
     access_config: Secret[GcsAccessConfig] = Field(default=GcsAccessConfig(), validate_default=True)
     connector_type: str = Field(default=CONNECTOR_TYPE, init=False)
 
@@ -108,6 +141,97 @@ class GcsIndexer(FsspecIndexer):
     def precheck(self) -> None:
         super().precheck()
 
+    def get_file_data(self) -> Iterable[dict[str, Any]]:
+        if self.index_config.recursive and self.index_config.parallel_workers > 1:
+            return self.list_files_parallel()
+        return super().get_file_data()
+
+    async def get_async_fs(self) -> "GCSFileSystem":
+        from gcsfs import GCSFileSystem
+
+        fs = GCSFileSystem(
+            asynchronous=True,
+            skip_instance_cache=True,
+            # Listings are consumed once, don't keep every page of the bucket in memory
+            use_listings_cache=False,
+            **self.connection_config.get_access_config(),
+        )
+        await fs._set_session()
+        return fs
+
+    def list_files_parallel(self) -> Generator[dict[str, Any], None, None]:
+        """Walk the prefix tree with `parallel_workers` concurrent listings, yielding files as
+        each listing completes rather than once the whole bucket has been listed."""
+        # Pages of files, then None once done or the exception listing failed with. Bounded so
+        # listing can't run arbitrarily far ahead of a slow consumer.
+        pages: queue.Queue[Union[list[dict[str, Any]], BaseException, None]] = queue.Queue(
+            maxsize=2 * self.index_config.parallel_workers
+        )
+        stop = threading.Event()
+
+        def list_prefixes() -> None:
+            try:
+                asyncio.run(self.list_prefixes(pages=pages, stop=stop))
+            except BaseException as e:
+                put_page(pages=pages, stop=stop, page=e)
+            else:
+                put_page(pages=pages, stop=stop, page=None)
+
+        # Indexers run synchronously, the listing gets its own event loop on a thread
+        threading.Thread(target=list_prefixes, name="gcs-lister", daemon=True).start()
+        try:
+            while (page := pages.get()) is not None:
+                if isinstance(page, BaseException):
+                    raise page
+                yield from page
+        finally:
+            stop.set()
+
+    async def list_prefixes(self, pages: queue.Queue, stop: threading.Event) -> None:
+        fs = await self.get_async_fs()
+        prefixes: asyncio.Queue[str] = asyncio.Queue()
+        root = self.index_config.path_without_protocol
+        prefixes.put_nowait(root)
+        queued = {root.rstrip("/")}
+
+        async def worker() -> None:
+            while True:
+                prefix = await prefixes.get()
+                try:
+                    entries = await fs._ls(prefix, detail=True)
+                    files = []
+                    for entry in entries:
+                        if entry.get("type") == "directory":
+                            # A folder marker object lists the prefix itself as a directory
+                            name = entry["name"].rstrip("/")
+                            if name not in queued:
+                                queued.add(name)
+                                prefixes.put_nowait(entry["name"])
+                        elif entry.get("type") == "file" and entry.get("size"):
+                            files.append(entry)
+                    if files:
+                        # Waits for the consumer on a thread, so other listings keep going
+                        await asyncio.to_thread(put_page, pages=pages, stop=stop, page=files)
+                finally:
+                    prefixes.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.index_config.parallel_workers)]
+        all_listed = asyncio.create_task(prefixes.join())
+        try:
+            while not all_listed.done() and not stop.is_set():
+                done, _ = await asyncio.wait(
+                    [all_listed, *workers], timeout=1, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task is not all_listed:
+                        # Workers only return by raising, a failed listing fails the index
+                        task.result()
+        finally:
+            for task in [all_listed, *workers]:
+                task.cancel()
+            if session := getattr(fs, "session", None):
+                await session.close()
+
     def get_metadata(self, file_data: dict) -> FileDataSourceMetadata:
         path = file_data["name"]
         date_created = None
@@ -137,7 +261,46 @@ class GcsIndexer(FsspecIndexer):
 
 
 class GcsDownloaderConfig(FsspecDownloaderConfig):
-    pass
+    parallel_part_size: int = Field(
+        default=32 * 1024 * 1024,
+        description="Objects larger than this many bytes are downloaded "
+        "as concurrent range requests of this size.",
+    )
+    max_concurrency: int = Field(
+        default=8, description="Maximum number of concurrent range requests per object."
+    )
+    max_concurrent_objects: int = Field(
+        default=8,
+        description="Maximum number of objects downloaded concurrently by one downloader, "
+        "each of which may use up to `max_concurrency` range requests.",
+    )
+    stream_chunk_size: int = Field(
+        default=1024 * 1024,
+        description="Size of the chunks ranged downloads are streamed to disk in.",
+    )
+    aggregate_below: Optional[int] = Field(
+        default=None,
+        description="If set, objects smaller than this many bytes are packed into shared "
+        "shard files in the download directory rather than written as one file each.",
+    )
+    use_uring: bool = Field(
+        default=False,
+        description="Write downloaded content to disk through a shared io_uring "
+        "(Linux only, requires `liburing` from the `gcs-uring` extra), falls back to "
+        "regular writes otherwise.",
+    )
+    use_uring_sqpoll: bool = Field(
+        default=False,
+        description="With `use_uring`, set the ring up in SQPOLL mode so a kernel thread picks "
+        "up writes without a submit syscall. Needs Linux 5.11+ (or CAP_SYS_ADMIN) and costs "
+        "a polling kernel thread, falls back to a regular ring if refused.",
+    )
+    uring_registered_buffers: int = Field(
+        default=0,
+        description="With `use_uring`, register this many `stream_chunk_size` buffers with the "
+        "ring; streamed content is collected into them and written as fixed buffers. "
+        "The buffers are pinned in memory, 0 disables them.",
+    )
 
 
 @dataclass
@@ -146,6 +309,284 @@ class GcsDownloader(FsspecDownloader):
     connection_config: GcsConnectionConfig
     connector_type: str = CONNECTOR_TYPE
     download_config: Optional[GcsDownloaderConfig] = field(default_factory=GcsDownloaderConfig)
+    _async_fs: Optional[tuple[asyncio.AbstractEventLoop, "GCSFileSystem"]] = field(
+        init=False, default=None, repr=False
+    )
+    _prefetch_semaphore: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = field(
+        init=False, default=None, repr=False
+    )
+    _sink: Optional[AggregatedDownloadSink] = field(init=False, default=None, repr=False)
+    # io_uring writes per fd that haven't been seen to complete yet
+    _pending_writes: dict[int, set[concurrent.futures.Future]] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    async def get_async_fs(self) -> "GCSFileSystem":
+        # gcsfs binds its http session to the event loop it was created on, so
+        # the shared (sync) instance can't be awaited from the pipeline's loop
+        from gcsfs import GCSFileSystem
+
+        loop = asyncio.get_running_loop()
+        if self._async_fs is None or self._async_fs[0] is not loop:
+            fs = GCSFileSystem(
+                asynchronous=True,
+                skip_instance_cache=True,
+                **self.connection_config.get_access_config(),
+            )
+            await fs._set_session()
+            self._async_fs = (loop, fs)
+        return self._async_fs[1]
+
+    def get_prefetch_semaphore(self) -> asyncio.Semaphore:
+        # Limits how many objects are opened concurrently, created per loop for the same reason
+        loop = asyncio.get_running_loop()
+        if self._prefetch_semaphore is None or self._prefetch_semaphore[0] is not loop:
+            semaphore = asyncio.Semaphore(self.download_config.max_concurrent_objects)
+            self._prefetch_semaphore = (loop, semaphore)
+        return self._prefetch_semaphore[1]
+
+    @property
+    def uring_writer(self) -> Optional[UringWriter]:
+        if not self.download_config.use_uring:
+            return None
+        return get_uring_writer(
+            sqpoll=self.download_config.use_uring_sqpoll,
+            registered_buffers=self.download_config.uring_registered_buffers,
+            buffer_size=self.download_config.stream_chunk_size,
+        )
+
+    def open_download_fd(self, lpath: Path, flags: int, register: bool = False) -> int:
+        """Open a file to download into. Registering the fd with io_uring costs two syscalls,
+        so that is only done when `register` is set for downloads with many concurrent
+        writes, or for every fd with SQPOLL where the kernel thread does the fd lookups."""
+        fd = os.open(lpath, flags, 0o644)
+        if (writer := self.uring_writer) and (register or writer.sqpoll):
+            writer.register_fd(fd)
+        return fd
+
+    def close_download_fd(self, fd: int) -> None:
+        if pending := self._pending_writes.pop(fd, None):
+            # Writes of a cancelled download can still be queued or in the ring, the fd
+            # number must not be reused before they're done with it
+            concurrent.futures.wait(pending)
+        if writer := self.uring_writer:
+            writer.release_fd(fd)
+        os.close(fd)
+
+    async def wait_for_write(self, fd: int, future: concurrent.futures.Future) -> None:
+        """Await a queued io_uring write. It can't be taken back if the awaiting task is
+        cancelled, so it stays tracked until close_download_fd() has waited for it."""
+        pending = self._pending_writes.setdefault(fd, set())
+        pending.add(future)
+        await asyncio.wrap_future(future)
+        pending.discard(future)
+
+    async def write_at(self, fd: int, data: bytes, offset: int) -> None:
+        if writer := self.uring_writer:
+            await self.wait_for_write(fd=fd, future=writer.write(fd=fd, buf=data, offset=offset))
+        else:
+            os.pwrite(fd, data, offset)
+
+    async def write_stream(self, fd: int, content: "StreamReader", offset: int) -> int:
+        """Write everything left in `content` to fd at offset, returns the number of bytes
+        written."""
+        writer = self.uring_writer
+        buffer = writer.acquire_buffer() if writer else None
+        written = 0
+        if buffer is None:
+            while data := await content.read(self.download_config.stream_chunk_size):
+                await self.write_at(fd=fd, data=data, offset=offset + written)
+                written += len(data)
+            return written
+        # Network reads come back in whatever sizes are available, so collect them into
+        # the registered buffer and write it as a fixed buffer each time it fills up
+        buf_index, buf = buffer
+        filled = 0
+        future = None
+        try:
+            while data := await content.read(len(buf) - filled):
+                buf[filled : filled + len(data)] = data
+                filled += len(data)
+                if filled == len(buf):
+                    future = writer.write_fixed(fd=fd, buf_index=buf_index, offset=offset + written)
+                    await self.wait_for_write(fd=fd, future=future)
+                    written += filled
+                    filled = 0
+            if filled:
+                await self.write_at(fd=fd, data=bytes(buf[:filled]), offset=offset + written)
+                written += filled
+        finally:
+            writer.release_buffer(buf_index, after=future)
+        return written
+
+    async def get_object_version(
+        self, fs: "GCSFileSystem", rpath: str, file_data: FileData
+    ) -> tuple[int, Optional[str]]:
+        """Size and generation of the object to download. The indexed values are used when
+        both are known, every request then pins that generation so a stale size or an object
+        overwritten mid-download fails instead of producing a truncated or mixed file."""
+        size = file_data.metadata.filesize_bytes
+        generation = file_data.additional_metadata.get("generation")
+        if size is None or generation is None:
+            info = await fs._info(rpath)
+            size, generation = info["size"], info.get("generation")
+        return int(size), generation
+
+    async def stream_range(
+        self,
+        fs: "GCSFileSystem",
+        rpath: str,
+        fd: int,
+        start: int,
+        end: int,
+        offset: int,
+        generation: Optional[str] = None,
+    ) -> None:
+        """Write bytes [start, end) of the object to fd at offset, chunk by chunk as they arrive
+        rather than materializing the whole range as one bytes object."""
+        from gcsfs.retry import retry_request, validate_response
+
+        if end <= start:
+            return
+
+        # Mirrors gcsfs' own _get_file_request, retrying the whole range on failure is safe
+        # since every chunk is written at a fixed offset
+        @retry_request(retries=6)
+        async def _stream() -> None:
+            async with fs.session.get(
+                url=fs.url(rpath),
+                params=fs._get_params({"generation": generation}),
+                headers=fs._get_headers({"Range": f"bytes={start}-{end - 1}"}),
+                timeout=fs.requests_timeout,
+            ) as r:
+                if r.status == 404 and generation is not None:
+                    raise FileNotFoundError(
+                        f"generation {generation} of {rpath} no longer exists, "
+                        "it was overwritten or deleted after indexing"
+                    )
+                if r.status >= 400:
+                    validate_response(r.status, await r.read(), rpath)
+                served_generation = r.headers.get("x-goog-generation")
+                if generation is not None and served_generation not in (None, str(generation)):
+                    raise OSError(
+                        f"expected generation {generation} of {rpath}, got {served_generation}"
+                    )
+                written = await self.write_stream(fd=fd, content=r.content, offset=offset)
+            if written != end - start:
+                raise OSError(f"expected {end - start} bytes from {rpath}, got {written}")
+
+        await _stream()
+
+    async def download_with_uring(
+        self,
+        fs: "GCSFileSystem",
+        rpath: str,
+        lpath: Path,
+        size: int,
+        generation: Optional[str] = None,
+    ) -> None:
+        fd = self.open_download_fd(lpath=lpath, flags=os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            await self.stream_range(
+                fs=fs, rpath=rpath, fd=fd, start=0, end=size, offset=0, generation=generation
+            )
+        except BaseException:
+            lpath.unlink(missing_ok=True)
+            raise
+        finally:
+            self.close_download_fd(fd)
+
+    @property
+    def sink(self) -> AggregatedDownloadSink:
+        if self._sink is None:
+            self._sink = AggregatedDownloadSink(base_dir=self.download_dir / "_aggregated")
+        return self._sink
+
+    def close(self) -> None:
+        if self._sink is not None:
+            # Only shard fds are left, downloads to their own file wait when they close it
+            pending = [future for futures in self._pending_writes.values() for future in futures]
+            self._pending_writes.clear()
+            concurrent.futures.wait(pending)
+            self._sink.close()
+            self._sink = None
+
+    def forget_created_dirs(self) -> None:
+        super().forget_created_dirs()
+        # The shards went with the download dir, later small files start new ones
+        self.close()
+
+    async def download_to_sink(
+        self,
+        fs: "GCSFileSystem",
+        rpath: str,
+        key: str,
+        size: int,
+        generation: Optional[str] = None,
+    ) -> tuple[Path, tuple[int, int]]:
+        fd, shard_path, offset = self.sink.reserve(length=size)
+        await self.stream_range(
+            fs=fs, rpath=rpath, fd=fd, start=0, end=size, offset=offset, generation=generation
+        )
+        self.sink.commit(
+            key=key, shard_path=shard_path, offset=offset, length=size, version=generation
+        )
+        return shard_path, (offset, size)
+
+    def get_packed_download(self, file_data: FileData) -> Optional[tuple[Path, tuple[int, int]]]:
+        if not self.download_config.aggregate_below:
+            return None
+        packed = self.sink.lookup(
+            key=file_data.identifier, version=file_data.additional_metadata.get("generation")
+        )
+        if packed is None:
+            return None
+        shard_path, offset, length = packed
+        return shard_path, (offset, length)
+
+    async def download_in_parts(
+        self,
+        fs: "GCSFileSystem",
+        rpath: str,
+        lpath: Path,
+        size: int,
+        generation: Optional[str] = None,
+    ) -> None:
+        part_size = self.download_config.parallel_part_size
+        semaphore = asyncio.Semaphore(self.download_config.max_concurrency)
+        fd = self.open_download_fd(lpath=lpath, flags=os.O_WRONLY | os.O_CREAT, register=True)
+        try:
+            os.ftruncate(fd, size)
+
+            async def download_part(start: int) -> None:
+                end = min(start + part_size, size)
+                async with semaphore:
+                    await self.stream_range(
+                        fs=fs,
+                        rpath=rpath,
+                        fd=fd,
+                        start=start,
+                        end=end,
+                        offset=start,
+                        generation=generation,
+                    )
+
+            parts = [
+                asyncio.create_task(download_part(start)) for start in range(0, size, part_size)
+            ]
+            try:
+                await asyncio.gather(*parts)
+            finally:
+                # gather() leaves the other parts running when one fails, they have to be done
+                # writing before the fd is closed and its number can be reused
+                for part in parts:
+                    part.cancel()
+                await asyncio.gather(*parts, return_exceptions=True)
+        except BaseException:
+            lpath.unlink(missing_ok=True)
+            raise
+        finally:
+            self.close_download_fd(fd)
 
     @requires_dependencies(["gcsfs", "fsspec"], extras="gcs")
     def run(self, file_data: FileData, **kwargs: Any) -> DownloadResponse:
@@ -153,7 +594,53 @@ class GcsDownloader(FsspecDownloader):
 
     @requires_dependencies(["gcsfs", "fsspec"], extras="gcs")
     async def run_async(self, file_data: FileData, **kwargs: Any) -> DownloadResponse:
-        return await super().run_async(file_data=file_data, **kwargs)
+        download_path = self.get_download_path(file_data=file_data)
+        rpath = file_data.additional_metadata["original_file_path"]
+        aggregate_below = self.download_config.aggregate_below
+        # Everything but the plain download writes with os.pwrite,
+        # which is not available on every platform (e.g. Windows)
+        can_pwrite = hasattr(os, "pwrite")
+        byte_range = None
+        try:
+            fs = await self.get_async_fs()
+            async with self.get_prefetch_semaphore():
+                size, generation = await self.get_object_version(
+                    fs=fs, rpath=rpath, file_data=file_data
+                )
+                if (
+                    can_pwrite
+                    and aggregate_below
+                    and size < aggregate_below
+                    # Archives are uncompressed from their own download path
+                    and not download_path.name.endswith(ARCHIVE_FILE_EXT)
+                ):
+                    download_path, byte_range = await self.download_to_sink(
+                        fs=fs,
+                        rpath=rpath,
+                        key=file_data.identifier,
+                        size=size,
+                        generation=generation,
+                    )
+                elif can_pwrite and size > self.download_config.parallel_part_size:
+                    logger.debug(f"downloading {rpath} ({size} bytes) as concurrent range requests")
+                    self.ensure_parent_dir(download_path)
+                    await self.download_in_parts(
+                        fs=fs, rpath=rpath, lpath=download_path, size=size, generation=generation
+                    )
+                elif can_pwrite and self.download_config.use_uring:
+                    self.ensure_parent_dir(download_path)
+                    await self.download_with_uring(
+                        fs=fs, rpath=rpath, lpath=download_path, size=size, generation=generation
+                    )
+                else:
+                    self.ensure_parent_dir(download_path)
+                    await fs._get_file(rpath, download_path.as_posix())
+        except Exception as e:
+            logger.error(f"failed to download file {file_data.identifier}: {e}", exc_info=True)
+            raise SourceConnectionNetworkError(f"failed to download file {file_data.identifier}")
+        return self.generate_download_response(
+            file_data=file_data, download_path=download_path, byte_range=byte_range
+        )
 
 
 class GcsUploaderConfig(FsspecUploaderConfig):
@@ -1,10 +1,12 @@
 from abc import ABC
 from dataclasses import dataclass
+from io import BytesIO
 from pathlib import Path
 from typing import Any, Optional
 
 from pydantic import BaseModel, Field, SecretStr
 
+from unstructured_ingest.utils.aggregated_sink import read_byte_range
 from unstructured_ingest.utils.data_prep import flatten_dict
 from unstructured_ingest.utils.dep_check import requires_dependencies
 from unstructured_ingest.v2.interfaces.process import BaseProcess
@@ -130,7 +132,12 @@ class Partitioner(BaseProcess, ABC):
 
     @requires_dependencies(dependencies=["unstructured"])
     def partition_locally(
-        self, filename: Path, metadata: Optional[dict] = None, **kwargs
+        self,
+        filename: Path,
+        metadata: Optional[dict] = None,
+        byte_range: Optional[tuple[int, int]] = None,
+        metadata_filename: Optional[str] = None,
+        **kwargs,
     ) -> list[dict]:
         from unstructured.documents.elements import DataSourceMetadata
         from unstructured.partition.auto import partition
@@ -142,8 +149,15 @@ class Partitioner(BaseProcess, ABC):
 
         logger.debug(f"using local partition with kwargs: {self.config.to_partition_kwargs()}")
         logger.debug(f"partitioning file {filename} with metadata {metadata}")
+        if byte_range:
+            file_kwargs = {
+                "file": BytesIO(read_byte_range(path=filename, byte_range=byte_range)),
+                "metadata_filename": metadata_filename,
+            }
+        else:
+            file_kwargs = {"filename": str(filename.resolve())}
         elements = partition(
-            filename=str(filename.resolve()),
+            **file_kwargs,
             data_source_metadata=FileDataSourceMetadata.from_dict(metadata),
             **self.config.to_partition_kwargs(),
         )
@@ -151,7 +165,12 @@ class Partitioner(BaseProcess, ABC):
 
     @requires_dependencies(dependencies=["unstructured_client"], extras="remote")
     async def partition_via_api(
-        self, filename: Path, metadata: Optional[dict] = None, **kwargs
+        self,
+        filename: Path,
+        metadata: Optional[dict] = None,
+        byte_range: Optional[tuple[int, int]] = None,
+        metadata_filename: Optional[str] = None,
+        **kwargs,
     ) -> list[dict]:
         metadata = metadata or {}
         logger.debug(f"partitioning file {filename} with metadata: {metadata}")
@@ -161,6 +180,8 @@ class Partitioner(BaseProcess, ABC):
             api_key=self.config.api_key.get_secret_value(),
             filename=filename,
             api_parameters=self.config.to_partition_kwargs(),
+            byte_range=byte_range,
+            metadata_filename=metadata_filename,
         )
 
         # Append the data source metadata the auto partition does for you
@@ -4,19 +4,28 @@ from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
+from unstructured_ingest.utils.aggregated_sink import read_byte_range
 from unstructured_ingest.v2.logger import logger
 
 if TYPE_CHECKING:
     from unstructured_client.models.operations import PartitionRequest
 
 
-def create_partition_request(filename: Path, parameters_dict: dict) -> "PartitionRequest":
+def create_partition_request(
+    filename: Path,
+    parameters_dict: dict,
+    byte_range: Optional[tuple[int, int]] = None,
+    metadata_filename: Optional[str] = None,
+) -> "PartitionRequest":
     """Given a filename and a dict of API parameters, return a PartitionRequest for use
     by unstructured-client. Remove any params that aren't recognized by the SDK.
 
     Args:
         filename: Path to the file being partitioned
         parameters_dict: A mapping of all API params we want to send
+        byte_range: (offset, length) of the content within filename, if it was packed
+            into a shared file
+        metadata_filename: File name to report to the API when using byte_range
 
     Returns: A PartitionRequest containing the file and all valid params
     """
@@ -41,12 +50,18 @@ def create_partition_request(filename: Path, parameters_dict: dict) -> "Partitio
 
     logger.debug(f"using hosted partitioner with kwargs: {parameters_dict}")
 
-    with open(filename, "rb") as f:
+    if byte_range:
         files = Files(
-            content=f.read(),
-            file_name=str(filename.resolve()),
+            content=read_byte_range(path=filename, byte_range=byte_range),
+            file_name=metadata_filename or str(filename.resolve()),
         )
-        filtered_partition_request["files"] = files
+    else:
+        with open(filename, "rb") as f:
+            files = Files(
+                content=f.read(),
+                file_name=str(filename.resolve()),
+            )
+    filtered_partition_request["files"] = files
 
     partition_params = PartitionParameters(**filtered_partition_request)
 
@@ -54,7 +69,12 @@ def create_partition_request(filename: Path, parameters_dict: dict) -> "Partitio
 
 
 async def call_api(
-    server_url: Optional[str], api_key: Optional[str], filename: Path, api_parameters: dict
+    server_url: Optional[str],
+    api_key: Optional[str],
+    filename: Path,
+    api_parameters: dict,
+    byte_range: Optional[tuple[int, int]] = None,
+    metadata_filename: Optional[str] = None,
 ) -> list[dict]:
     """Call the Unstructured API using unstructured-client.
 
@@ -63,6 +83,9 @@ async def call_api(
         api_key: The user's API key (can be empty if this is a self hosted API)
         filename: Path to the file being partitioned
         api_parameters: A dict containing the requested API parameters
+        byte_range: (offset, length) of the content within filename, if it was packed
+            into a shared file
+        metadata_filename: File name to report to the API when using byte_range
 
     Returns: A list of the file's elements, or an empty list if there was an error
     """
@@ -72,7 +95,12 @@ async def call_api(
         server_url=server_url,
         api_key_auth=api_key,
     )
-    partition_request = create_partition_request(filename=filename, parameters_dict=api_parameters)
+    partition_request = create_partition_request(
+        filename=filename,
+        parameters_dict=api_parameters,
+        byte_range=byte_range,
+        metadata_filename=metadata_filename,
+    )
 
     # TODO when client supports async, run without using run_in_executor
     # isolate the IO heavy call